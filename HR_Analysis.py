@@ -1,35 +1,117 @@
 # HR data analysis using dataset from IBM, UCI, U.S. Census Reports and Bureau of Labor Statistics
+import hashlib
+import os
+import tempfile
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from astropy.table import Table
+from numba import njit
 import warnings
 warnings.simplefilter("ignore")
 
 
-def read_dataframes():
+def read_csv_cached(csv_path, parquet_path, columns=None, **read_kwargs):
+    """
+        In this function, we are reading a csv file through a parquet copy of it. The csv is only parsed when the
+        parquet file is missing or older than the csv, after which the parquet copy is (re)written. A hash of the
+        read options is added to the parquet file name, so every set of options gets its own copy.
+        :param csv_path: csv file to read
+        :param parquet_path: parquet file used as the cache for csv_path, before the options hash is added
+        :param columns: optional column names to give the parsed csv before caching it
+        :param read_kwargs: keyword arguments passed on to pd.read_csv
+        :return: We return the dataframe read from the cache or the csv.
+
+        >>> cache_dir = tempfile.TemporaryDirectory()
+        >>> cache_path = os.path.join(cache_dir.name, 'IBM_HR_data.parquet')
+        >>> df = read_csv_cached('IBM_HR_data.csv', cache_path, engine='pyarrow', dtype_backend='pyarrow')
+        >>> df.shape
+        (1470, 35)
+        >>> df = read_csv_cached('IBM_HR_data.csv', cache_path, usecols=['Age'])
+        >>> df.shape
+        (1470, 1)
+        >>> df = read_csv_cached('IBM_HR_data.csv', cache_path, usecols=['Age'])
+        >>> df['Age'].dtype
+        dtype('int64')
+
+        A truncated or corrupt cache file is treated as a miss and rewritten:
+
+        >>> import glob
+        >>> corrupt_dir = tempfile.TemporaryDirectory()
+        >>> corrupt_path = os.path.join(corrupt_dir.name, 'IBM_HR_data.parquet')
+        >>> read_csv_cached('IBM_HR_data.csv', corrupt_path).shape
+        (1470, 35)
+        >>> for cached in glob.glob(os.path.join(corrupt_dir.name, '*.parquet')):
+        ...     with open(cached, 'wb') as f:
+        ...         _ = f.write(b'PAR')
+        >>> read_csv_cached('IBM_HR_data.csv', corrupt_path).shape
+        (1470, 35)
+        >>> read_csv_cached('IBM_HR_data.csv', corrupt_path).shape
+        (1470, 35)
+    """
+    options = repr((columns, sorted(read_kwargs.items())))
+    root, ext = os.path.splitext(parquet_path)
+    parquet_path = '{}.{}{}'.format(root, hashlib.md5(options.encode('utf-8')).hexdigest()[:12], ext)
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+        # read the cache back with the same dtype backend the csv read would have used
+        parquet_kwargs = {k: v for k, v in read_kwargs.items() if k == 'dtype_backend'}
+        try:
+            return pd.read_parquet(parquet_path, **parquet_kwargs)
+        except (OSError, ValueError):
+            # an unreadable cache file is treated as a miss and rewritten below
+            pass
+    df = pd.read_csv(csv_path, **read_kwargs)
+    if columns is not None:
+        df.columns = columns
+    # write to a temporary file first so an interrupted write never leaves a truncated cache behind
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(parquet_path) or '.')
+        os.close(fd)
+        df.to_parquet(tmp_path, compression='snappy')
+        os.replace(tmp_path, parquet_path)
+    except OSError:
+        # the cache is only an optimisation, keep going with the parsed csv if it cannot be written
+        pass
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return df
+
+
+def read_dataframes(cache_dir='.'):
     """
         In this function,  we are are reading the required csv files from the dataset into dataframes.
+        :param cache_dir: directory for the parquet copies of the csv files
         :return: We return the Ibm_df, adult_df as dataframes after reading the csv files.
 
-        >>> df_1, df_2 = read_dataframes()
+        >>> cache_dir = tempfile.TemporaryDirectory()
+        >>> df_1, df_2 = read_dataframes(cache_dir.name)
         >>> df_1.shape
         (1470, 35)
         >>> df_2.shape
         (32563, 9)
     """
-    Ibm_df = pd.read_csv('IBM_HR_data.csv',
-                         delimiter=',', encoding='UTF-8')
-    ad_df = pd.read_csv('adult.csv',
-                        delimiter=',', header=None, encoding='UTF-8')
-    ad_df.columns = ['Age', 'JobType', 'EmpID',
-                     'EducationLevel', 'Level', 'MaritalStatus',
-                     'JobPosition', 'MaritalStatus_Desc', 'Race',
-                     'Gender', 'Column_1', 'Column_2',
-                     'Column_3', 'Location', 'ExpectedSalary']
-    adult_df = ad_df[['Age', 'JobType', 'EducationLevel',
-                      'Level', 'JobPosition', 'MaritalStatus',
-                      'Location', 'Gender', 'ExpectedSalary']].sort_values(by='Age', ascending=True)
+    Ibm_df = read_csv_cached('IBM_HR_data.csv', os.path.join(cache_dir, 'IBM_HR_data.parquet'),
+                             delimiter=',', encoding='UTF-8',
+                             engine='pyarrow', dtype_backend='pyarrow')
+    # narrow the numeric columns so the merge and groupby move fewer bytes
+    Ibm_df = Ibm_df.astype({'Attrition': 'category', 'BusinessTravel': 'category',
+                            'Age': 'int8[pyarrow]', 'Education': 'int8[pyarrow]',
+                            'MonthlyIncome': 'int32[pyarrow]', 'DistanceFromHome': 'int16[pyarrow]'})
+    # only parse the columns we use; the pyarrow reader keeps strings in Arrow buffers instead of Python objects.
+    # It cannot combine names with usecols, so columns are picked by position and named afterwards
+    ad_df = read_csv_cached('adult.csv', os.path.join(cache_dir, 'adult.parquet'),
+                            columns=['Age', 'JobType', 'EducationLevel',
+                                     'Level', 'MaritalStatus', 'JobPosition',
+                                     'Gender', 'Location', 'ExpectedSalary'],
+                            delimiter=',', header=None, encoding='UTF-8',
+                            usecols=[0, 1, 3, 4, 5, 6, 9, 13, 14],
+                            engine='pyarrow', dtype_backend='pyarrow')
+    # the repeat-heavy string columns go straight to category, Age matches the IBM join key
+    ad_df = ad_df.astype({'JobType': 'category', 'EducationLevel': 'category',
+                          'JobPosition': 'category', 'MaritalStatus': 'category',
+                          'Location': 'category', 'Gender': 'category',
+                          'ExpectedSalary': 'category', 'Age': 'int8[pyarrow]'})
+    adult_df = ad_df
 
     return Ibm_df, adult_df
 
@@ -47,16 +129,12 @@ def filter_data(adult_df):
     >>> df.shape
     (18889, 9)
     """
-    adult_df['JobType'] = adult_df['JobType'].str.strip()
-    adult_df['Location'] = adult_df['Location'].str.strip()
-    adult_df['Gender'] = adult_df['Gender'].str.strip()
-    adult_df['JobPosition'] = adult_df['JobPosition'].str.strip()
-    adult_df['EducationLevel'] = adult_df['EducationLevel'].str.strip()
-    adult_df['ExpectedSalary'] = adult_df['ExpectedSalary'].str.strip()
-    ad_df_private = adult_df[adult_df['JobType'] == 'Private']
-    ad_df_private_US = ad_df_private[ad_df_private['Location'] == 'United-States']
-    ad_df_private_US = ad_df_private_US[ad_df_private_US['Age'] > 17]
-    ad_df_private_US = ad_df_private_US[ad_df_private_US['Age'] <= 60]
+    # these columns only hold a handful of distinct values, so strip the categories instead of every row
+    for column in ['JobType', 'Location', 'Gender', 'JobPosition', 'EducationLevel', 'ExpectedSalary']:
+        adult_df[column] = adult_df[column].astype('category')
+        adult_df[column] = adult_df[column].cat.rename_categories(adult_df[column].cat.categories.str.strip())
+    # evaluate all conditions as one expression and slice once instead of copying the frame after every condition
+    ad_df_private_US = adult_df.query("JobType == 'Private' and Location == 'United-States' and 18 <= Age <= 60")
     return ad_df_private_US
 
 
@@ -74,30 +152,20 @@ def club_similar_values(adult_df):
         >>> sim_df.shape != (32563, 13)
         True
     """
-    adult_df.loc[adult_df.JobPosition == "Adm-clerical", 'Education Field'] = "Human Resources"
-    adult_df.loc[adult_df.JobPosition == "Farming-fishing", 'Education Field'] = "Life Sciences"
-    adult_df.loc[(adult_df.JobPosition == "Machine-op-inspct") | (
-            adult_df.JobPosition == "Tech-support"), 'Education Field'] = "Technical Degree"
-    adult_df.loc[
-        (adult_df.JobPosition == "Other-service") | (adult_df.JobPosition == "Transport-moving") | (
-                adult_df.JobPosition == "Handlers-cleaners"), 'Education Field'] = "Other"
-    adult_df.loc[(adult_df.JobPosition == "Protective-serv") | (
-            adult_df.JobPosition == "Prof-specialty"), 'Education Field'] = "Medical"
-    adult_df.loc[adult_df.JobPosition == "Sales", 'Education Field'] = "Management"
-
-    adult_df.loc[(adult_df.EducationLevel == "10th") | (adult_df.EducationLevel == "11th") | (
-            adult_df.EducationLevel == "12th") | (adult_df.EducationLevel == "1st-4th") | (
-                                 adult_df.EducationLevel == "5th-6th")
-                         | (adult_df.EducationLevel == "7th-8th") | (
-                                 adult_df.EducationLevel == "9th"), 'Education'] = 2
-    adult_df.loc[
-        (adult_df.EducationLevel == "Assoc-acdm") | (adult_df.EducationLevel == "Assoc-voc") | (
-                adult_df.EducationLevel == "Some-college") | (
-                adult_df.EducationLevel == "HS-grad"), 'Education'] = 2
-    adult_df.loc[adult_df.EducationLevel == "Bachelors", 'Education'] = 3
-    adult_df.loc[(adult_df.EducationLevel == "Masters") | (
-            adult_df.EducationLevel == "Prof-school"), 'Education'] = 4
-    adult_df.loc[adult_df.EducationLevel == "Doctorate", 'Education'] = 5
+    job_to_field = {"Adm-clerical": "Human Resources",
+                    "Farming-fishing": "Life Sciences",
+                    "Machine-op-inspct": "Technical Degree", "Tech-support": "Technical Degree",
+                    "Other-service": "Other", "Transport-moving": "Other", "Handlers-cleaners": "Other",
+                    "Protective-serv": "Medical", "Prof-specialty": "Medical",
+                    "Sales": "Management"}
+    edu_to_level = {"10th": 2, "11th": 2, "12th": 2, "1st-4th": 2, "5th-6th": 2, "7th-8th": 2, "9th": 2,
+                    "Assoc-acdm": 2, "Assoc-voc": 2, "Some-college": 2, "HS-grad": 2,
+                    "Bachelors": 3,
+                    "Masters": 4, "Prof-school": 4,
+                    "Doctorate": 5}
+
+    adult_df = adult_df.assign(**{'Education Field': adult_df['JobPosition'].map(job_to_field),
+                                  'Education': adult_df['EducationLevel'].map(edu_to_level).astype('int8[pyarrow]')})
 
     return adult_df
 
@@ -113,11 +181,12 @@ def probable_expected_salary(ad_df_private_US):
         >>> ad_df.columns = ['Age', 'JobType', 'EmpID', 'EducationLevel', 'Level', 'MaritalStatus', 'JobPosition', 'MaritalStatus_Desc', 'Race', 'Gender', 'Column_1', 'Column_2', 'Column_3', 'Location', 'ExpectedSalary']
     """
     ad_df_private_US = ad_df_private_US.dropna(subset=['Education Field'])
-    ad_df_private_US.loc[ad_df_private_US.ExpectedSalary == "<=50K", 'Probable Salary Value'] = 0
-    ad_df_private_US.loc[ad_df_private_US.ExpectedSalary == ">50K", 'Probable Salary Value'] = 100
-    ad_dataframe = pd.DataFrame(
-        ad_df_private_US.groupby(['Age', 'Education', 'Education Field', 'Gender'])['Probable Salary Value'].mean())
-    return ad_dataframe
+    # share of people expecting more than 50K, averaged over a narrow int8 flag and scaled to 0-100 once
+    is_gt = (ad_df_private_US['ExpectedSalary'].to_numpy() == ">50K").astype(np.int8)
+    ad_df_private_US = ad_df_private_US.assign(is_gt=is_gt)
+    ad_dataframe = ad_df_private_US.groupby(['Age', 'Education', 'Education Field', 'Gender'],
+                                            observed=True, sort=False)['is_gt'].mean().mul(100)
+    return ad_dataframe.rename('Probable Salary Value').reset_index()
 
 
 def merge_datasets(Ibm_df, ad_dataframe):
@@ -134,12 +203,21 @@ def merge_datasets(Ibm_df, ad_dataframe):
         >>> sim_df = club_similar_values(ad_df_1)
         >>> merged = merge_datasets(df_1, sim_df)
         >>> merged.shape
-        (0, 43)
+        (0, 42)
     """
     Ibm_df['EducationField'] = Ibm_df['EducationField'].str.strip()
-    merged_dataframe = pd.merge(Ibm_df, ad_dataframe, how='inner',
-                                left_on=['Age', 'EducationField', 'Gender', 'Education'],
-                                right_on=['Age', 'Education Field', 'Gender', 'Education'])
+    # factorize each string key over both frames at once so the join runs on integer codes
+    left_codes, right_codes = {}, {}
+    for code_col, left_key, right_key in [('EducationFieldCode', 'EducationField', 'Education Field'),
+                                          ('GenderCode', 'Gender', 'Gender')]:
+        codes, _ = pd.factorize(pd.concat([Ibm_df[left_key].astype(object),
+                                           ad_dataframe[right_key].astype(object)], ignore_index=True))
+        left_codes[code_col] = codes[:len(Ibm_df)]
+        right_codes[code_col] = codes[len(Ibm_df):]
+    right_df = ad_dataframe.drop(columns=['Education Field', 'Gender']).assign(**right_codes)
+    merged_dataframe = pd.merge(Ibm_df.assign(**left_codes), right_df, how='inner',
+                                on=['Age', 'EducationFieldCode', 'GenderCode', 'Education'],
+                                sort=False).drop(columns=['EducationFieldCode', 'GenderCode'])
     sorted_dataframe = merged_dataframe.sort_values(by='Age', ascending=True)
     return sorted_dataframe
 
@@ -149,61 +227,63 @@ def split_dataframe_for_analysis_1(merged_dataframe):
         In this function, we are splitting the dataframe based on expected salary .
         :return: We return the sorted_dataframe after merging.
 
-        >>> Ibm_df, adult_df = read_dataframes()
+        >>> cache_dir = tempfile.TemporaryDirectory()
+        >>> Ibm_df, adult_df = read_dataframes(cache_dir.name)
         >>> ad_df_private_US = filter_data(adult_df)
         >>> ad_df_private_US = club_similar_values(ad_df_private_US)
         >>> ad_dataframe = probable_expected_salary(ad_df_private_US)
         >>> merged_dataframe = merge_datasets(Ibm_df, ad_dataframe)
-        >>> salary_less, salary_greater = split_dataframe_for_analysis_1(merged_dataframe)
+        >>> salary_less, salary_greater, salary_earned_less, salary_earned_greater = split_dataframe_for_analysis_1(merged_dataframe)
         >>> salary_less.shape
-        (494, 37)
+        (494, 36)
         >>> salary_greater.shape
-        (208, 37)
+        (208, 36)
         >>> salary_greater.shape > salary_less.shape
         False
+        >>> salary_earned_less.shape
+        (494,)
     """
-    merged_dataframe['Salary Earned'] = merged_dataframe.MonthlyIncome * 12
-    salary_split = merged_dataframe[merged_dataframe['Attrition'] == 'Yes']
-    salary_split = merged_dataframe
-    salary_less = salary_split[salary_split['Probable Salary Value'] <= 50.0]
-    salary_greater = salary_split[salary_split['Probable Salary Value'] > 50.0]
-    return salary_less, salary_greater
+    # yearly salary stays a plain array aligned with the split frames instead of becoming another column
+    salary_earned = merged_dataframe['MonthlyIncome'].to_numpy(dtype=np.int32) * 12
+    probable_salary = merged_dataframe['Probable Salary Value'].to_numpy()
+    less = probable_salary <= 50.0
+    greater = probable_salary > 50.0
+    return merged_dataframe[less], merged_dataframe[greater], salary_earned[less], salary_earned[greater]
 
 
-def salary_attrition_analysis1(salary_less):
+def salary_attrition_analysis1(salary_less, salary_earned):
     """
         In this function, we are splitting the dataframe based on expected salary .
         :return: We return the sorted_dataframe after merging.
 
-        >>> Ibm_df, adult_df = read_dataframes()
+        >>> cache_dir = tempfile.TemporaryDirectory()
+        >>> Ibm_df, adult_df = read_dataframes(cache_dir.name)
         >>> ad_df_private_US = filter_data(adult_df)
         >>> ad_df_private_US = club_similar_values(ad_df_private_US)
         >>> ad_dataframe = probable_expected_salary(ad_df_private_US)
         >>> merged_dataframe = merge_datasets(Ibm_df, ad_dataframe)
-        >>> salary_less, salary_greater = split_dataframe_for_analysis_1(merged_dataframe)
+        >>> salary_less, salary_greater, salary_earned_less, salary_earned_greater = split_dataframe_for_analysis_1(merged_dataframe)
         >>> salary_greater.shape
-        (208, 37)
-        >>> salary_less_df = salary_attrition_analysis1(salary_less)
+        (208, 36)
+        >>> salary_less_df = salary_attrition_analysis1(salary_less, salary_earned_less)
         >>> salary_less_df['Percentage']
         Attrition  Is salary greater than expected
         Yes        False                              63.29
                    True                               36.71
         Name: Percentage, dtype: float64
     """
-    salary_data_less_attr = salary_less
-
-    count_yes = salary_data_less_attr.apply(lambda x: True if x['Attrition'] == 'Yes' else False, axis=1)
-
-    salary_data_less_attr = salary_less[salary_less['Attrition'] == 'Yes']
-    # Count number of True in series
-    numOfRowsYes = len(count_yes[count_yes == True].index)
+    attrition_yes = salary_less['Attrition'].to_numpy() == 'Yes'
+    salary_data_less_attr = salary_less[attrition_yes]
+    # Count number of True in mask
+    numOfRowsYes = int(attrition_yes.sum())
     # print(numOfRowsYes)
 
-    salary_data_less_attr['Is salary greater than expected'] = salary_data_less_attr['Salary Earned'].apply(
-        lambda x: 'True' if x > 50000 else 'False')
-    total_count = pd.DataFrame({'Count':
-                                    salary_data_less_attr.groupby(['Attrition', 'Is salary greater than expected'])[
-                                        'Is salary greater than expected'].count()})
+    salary_data_less_attr['Is salary greater than expected'] = np.where(
+        salary_earned[attrition_yes] > 50000, 'True', 'False')
+    total_count = salary_data_less_attr.value_counts(
+        ['Attrition', 'Is salary greater than expected']).sort_index().to_frame('Count')
+    # a categorical Attrition column also reports the empty 'No' combinations
+    total_count = total_count[total_count['Count'] > 0]
     total_count['Percentage'] = total_count['Count'] / numOfRowsYes * 100
     total_count.Percentage = total_count.Percentage.round(decimals=2)
     # print(total_count)
@@ -211,20 +291,21 @@ def salary_attrition_analysis1(salary_less):
     return total_count
 
 
-def salary_attrition_analysis2(salary_less):
+def salary_attrition_analysis2(salary_less, salary_earned):
     """
         In this function, we are splitting the dataframe based on expected salary .
         :return: We return the sorted_dataframe after merging.
 
-        >>> Ibm_df, adult_df = read_dataframes()
+        >>> cache_dir = tempfile.TemporaryDirectory()
+        >>> Ibm_df, adult_df = read_dataframes(cache_dir.name)
         >>> ad_df_private_US = filter_data(adult_df)
         >>> ad_df_private_US = club_similar_values(ad_df_private_US)
         >>> ad_dataframe = probable_expected_salary(ad_df_private_US)
         >>> merged_dataframe = merge_datasets(Ibm_df, ad_dataframe)
-        >>> salary_less, salary_greater = split_dataframe_for_analysis_1(merged_dataframe)
+        >>> salary_less, salary_greater, salary_earned_less, salary_earned_greater = split_dataframe_for_analysis_1(merged_dataframe)
         >>> salary_greater.shape
-        (208, 37)
-        >>> salary_less_df = salary_attrition_analysis2(salary_less)
+        (208, 36)
+        >>> salary_less_df = salary_attrition_analysis2(salary_less, salary_earned_less)
         >>> salary_less_df['Percentage']
         Attrition  Is salary less than expected
         Yes        False                           36.71
@@ -232,20 +313,18 @@ def salary_attrition_analysis2(salary_less):
         Name: Percentage, dtype: float64
 
     """
-    salary_data_less_attr = salary_less
-
-    count_yes = salary_data_less_attr.apply(lambda x: True if x['Attrition'] == 'Yes' else False, axis=1)
-
-    salary_data_less_attr = salary_less[salary_less['Attrition'] == 'Yes']
-    # Count number of True in series
-    numOfRowsYes = len(count_yes[count_yes == True].index)
+    attrition_yes = salary_less['Attrition'].to_numpy() == 'Yes'
+    salary_data_less_attr = salary_less[attrition_yes]
+    # Count number of True in mask
+    numOfRowsYes = int(attrition_yes.sum())
     # print(numOfRowsYes)
 
-    salary_data_less_attr['Is salary less than expected'] = salary_data_less_attr['Salary Earned'].apply(
-        lambda x: 'True' if x <= 50000 else 'False')
-    total_count = pd.DataFrame({'Count':
-                                    salary_data_less_attr.groupby(['Attrition', 'Is salary less than expected'])[
-                                        'Is salary less than expected'].count()})
+    salary_data_less_attr['Is salary less than expected'] = np.where(
+        salary_earned[attrition_yes] <= 50000, 'True', 'False')
+    total_count = salary_data_less_attr.value_counts(
+        ['Attrition', 'Is salary less than expected']).sort_index().to_frame('Count')
+    # a categorical Attrition column also reports the empty 'No' combinations
+    total_count = total_count[total_count['Count'] > 0]
     total_count['Percentage'] = total_count['Count'] / numOfRowsYes * 100
     total_count.Percentage = total_count.Percentage.round(decimals=2)
     # np.round(total_count, decimals=2)
@@ -254,6 +333,60 @@ def salary_attrition_analysis2(salary_less):
     return total_count
 
 
+@njit(cache=True)
+def tally_codes(row_codes, col_codes, n_rows, n_cols):
+    """
+
+    :param row_codes: integer category codes for the table rows
+    :param col_codes: integer category codes for the table columns
+    :param n_rows: number of row categories
+    :param n_cols: number of column categories
+    :return: count of every (row, column) code pair, pairs with a missing (-1) code are skipped
+
+    >>> tally_codes(np.array([0, 1, 1], dtype=np.int8), np.array([1, 0, 0], dtype=np.int8), 2, 2)
+    array([[0, 1],
+           [2, 0]])
+    >>> tally_codes(np.array([0, 1, -1], dtype=np.int8), np.array([-1, 0, 1], dtype=np.int8), 2, 2)
+    array([[0, 0],
+           [1, 0]])
+    """
+    out = np.zeros((n_rows, n_cols), np.int64)
+    for i in range(row_codes.shape[0]):
+        r = row_codes[i]
+        c = col_codes[i]
+        if r < 0 or c < 0:
+            continue
+        out[r, c] += 1
+    return out
+
+
+def travel_attrition_counts(travel_df):
+    """
+
+    :param travel_df: Dataframe containing values for IBM
+    :return: count of employees for every business travel frequency and attrition value
+
+    >>> Ibm_df = pd.read_csv('IBM_HR_data.csv', delimiter=',', encoding='UTF-8')
+    >>> travel_attrition_counts(Ibm_df)
+                        No  Yes
+    Non-Travel         138   12
+    Travel_Frequently  208   69
+    Travel_Rarely      887  156
+    >>> missing_df = pd.DataFrame({'BusinessTravel': ['Travel_Rarely', 'Travel_Rarely', 'Non-Travel'],
+    ...                            'Attrition': ['No', None, 'Yes']})
+    >>> travel_attrition_counts(missing_df)
+                   No  Yes
+    Non-Travel      0    1
+    Travel_Rarely   1    0
+    """
+    # both columns hold only a few distinct values, so tally their category codes in one pass
+    bt = travel_df['BusinessTravel'].astype('category')
+    at = travel_df['Attrition'].astype('category')
+    counts = tally_codes(bt.cat.codes.to_numpy(), at.cat.codes.to_numpy(),
+                         len(bt.cat.categories), len(at.cat.categories))
+    return pd.DataFrame(counts, index=bt.cat.categories, columns=at.cat.categories)
+
+
 def total_values_travel(travel_df, frequency):
     """
 
@@ -268,18 +401,19 @@ def total_values_travel(travel_df, frequency):
     >>> freq = total_values_travel(Ibm_df, 'None')
     >>> freq
     (0, 0, 0)
+    >>> missing_df = pd.DataFrame({'BusinessTravel': ['Travel_Rarely', 'Travel_Rarely', 'Non-Travel'],
+    ...                            'Attrition': ['No', None, 'Yes']})
+    >>> total_values_travel(missing_df, 'Travel_Rarely')
+    (2, 0, 1)
     """
-    count_freq = 0
-    count_attrition_y = 0
-    count_attrition_n = 0
-    for b_values in travel_df.index:
-        if travel_df['BusinessTravel'][b_values] == frequency:
-            count_freq += 1
+    # the total also counts rows whose attrition value is missing
+    count_freq = int((travel_df['BusinessTravel'] == frequency).sum())
+    counts = travel_attrition_counts(travel_df)
+    if frequency not in counts.index:
+        return count_freq, 0, 0
+    row = counts.loc[frequency]
 
-    count_attrition_y = attrition_values(travel_df, frequency, 'Yes')
-    count_attrition_n = attrition_values(travel_df, frequency, 'No')
-
-    return count_freq, count_attrition_y, count_attrition_n
+    return count_freq, int(row.get('Yes', 0)), int(row.get('No', 0))
 
 
 def attrition_values(df, freq, attr_value):
@@ -295,58 +429,87 @@ def attrition_values(df, freq, attr_value):
     >>> freq
     156
     """
-    freq_y = 0
-    for b_values in df.index:
-        if df['BusinessTravel'][b_values] == freq and df['Attrition'][b_values] == attr_value:
-            freq_y += 1
-    return freq_y
+    counts = travel_attrition_counts(df)
+    if freq not in counts.index or attr_value not in counts.columns:
+        return 0
+    return int(counts.loc[freq, attr_value])
 
 
-def create_table():
+def create_table(travel_df):
     """
 
+    :param travel_df: Dataframe containing values for IBM
     :return: table based on business travel frequency
-    >>> data_row = [('A', 10), ('B', 20), ('C', 40)]
-    >>> t2 = Table(rows=data_row, names=('Keys', 'Values'))
-    >>> print(t2)
-    Keys Values
-    ---- ------
-       A     10
-       B     20
-       C     40
+
+    >>> Ibm_df = pd.read_csv('IBM_HR_data.csv', delimiter=',', encoding='UTF-8')
+    >>> create_table(Ibm_df)
+                       Total Count  Attrition_yes  Attrition_no
+    Travel_Status                                              
+    Travel_Rarely             1043            156           887
+    Travel_Frequently          277             69           208
+    Non-Travel                 150             12           138
+    >>> create_table(Ibm_df[(Ibm_df['Attrition'] == 'Yes') & (Ibm_df['BusinessTravel'] != 'Non-Travel')])
+                       Total Count  Attrition_yes  Attrition_no
+    Travel_Status                                              
+    Travel_Rarely              156            156             0
+    Travel_Frequently           69             69             0
+    Non-Travel                   0              0             0
     """
-    t = Table()
-    data_rows = [('Travel_Rarely',
-                  total_values_travel(Ibm_df, 'Travel_Rarely')[0],
-                  total_values_travel(Ibm_df, 'Travel_Rarely')[1],
-                  total_values_travel(Ibm_df, 'Travel_Rarely')[2]),
-                 ('Travel_Frequently',
-                  total_values_travel(Ibm_df, 'Travel_Frequently')[0],
-                  total_values_travel(Ibm_df, 'Travel_Frequently')[0],
-                  total_values_travel(Ibm_df, 'Travel_Frequently')[0]),
-                 ('Non-Travel',
-                  total_values_travel(Ibm_df, 'Non-Travel')[0],
-                  total_values_travel(Ibm_df, 'Non-Travel')[1],
-                  total_values_travel(Ibm_df, 'Non-Travel')[2])
-                 ]
-    t1 = Table(rows=data_rows,
-               names=('Travel_Status', 'Total Count', 'Attriiton_yes', 'Attriiton_no'))
+    # travel frequencies or attrition values missing from the frame are reported as zero counts
+    frequencies = ['Travel_Rarely', 'Travel_Frequently', 'Non-Travel']
+    ct = travel_attrition_counts(travel_df).reindex(index=frequencies, columns=['Yes', 'No'], fill_value=0)
+    t1 = pd.DataFrame({'Total Count': travel_df['BusinessTravel'].value_counts().reindex(frequencies, fill_value=0),
+                       'Attrition_yes': ct['Yes'],
+                       'Attrition_no': ct['No']})
+    t1.index.name = 'Travel_Status'
 
     return t1
 
 
+def plot_all(d1, d2, values):
+    """
+    In this function, we are plotting attrition against distance from home. Plotly is only imported here so
+    that the numeric analysis does not pay for it.
+    :param d1: IBM dataframe for employees whose distance from home is less than 25
+    :param d2: IBM dataframe for employees whose distance from home is more than 25
+    :param values: attrition and no attrition shares for d1 followed by d2
+    """
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    # when the distance is less than 25
+    fig = px.scatter(d1, x='DistanceFromHome', y='Age', color="Attrition")
+    fig.show()
+    # when the distance is greater than 25
+    fig = px.scatter(d2, x='DistanceFromHome', y='Age', color="Attrition")
+    fig.show()
+
+    # displaying the distances for each
+    labels = ['Attrition when distance is less than 25', 'No attrition when distance is less than 25',
+              'Attrition when distance is more than 25', 'No attrition when distance is more than 25']
+
+    fig = go.Figure(data=[go.Pie(labels=labels, values=values)])
+    fig.show()
+
+
 if __name__ == '__main__':
+    import argparse
     import doctest
 
+    parser = argparse.ArgumentParser(description='HR attrition analysis on the IBM and adult datasets')
+    parser.add_argument('--plot', action='store_true', help='show the distance from home plots')
+    args = parser.parse_args()
+
     doctest.testmod()
     Ibm_df, adult_df = read_dataframes()
     ad_df_private_US = filter_data(adult_df)
     ad_df_private_US = club_similar_values(ad_df_private_US)
     ad_dataframe = probable_expected_salary(ad_df_private_US)
     merged_dataframe = merge_datasets(Ibm_df, ad_dataframe)
-    salary_less, salary_greater = split_dataframe_for_analysis_1(merged_dataframe)
-    salary_data_less_attr = salary_attrition_analysis1(salary_less)
-    salary_data_greater_attr = salary_attrition_analysis2(salary_greater)
+    salary_less, salary_greater, salary_earned_less, salary_earned_greater = \
+        split_dataframe_for_analysis_1(merged_dataframe)
+    salary_data_less_attr = salary_attrition_analysis1(salary_less, salary_earned_less)
+    salary_data_greater_attr = salary_attrition_analysis2(salary_greater, salary_earned_greater)
 
     print("\n Attrition percentage of people with salary expectation less than or equal to 50k : \n")
     print(salary_data_less_attr)
@@ -355,71 +518,47 @@ if __name__ == '__main__':
     print(salary_data_greater_attr)
     print("---------------------------------------------------------------------\n\n")
 
+    # counts per travel category, computed once and reused below
+    travel_table = create_table(Ibm_df)
+
     # calculating percentages when attrition has happened in each category
     # for travel rarely
-    perc1 = round(
-        (total_values_travel(Ibm_df, 'Travel_Rarely')[1] / total_values_travel(Ibm_df, 'Travel_Rarely')[0]) * 100, 2)
+    perc1 = round((travel_table.loc['Travel_Rarely', 'Attrition_yes'] /
+                   travel_table.loc['Travel_Rarely', 'Total Count']) * 100, 2)
     # for travel frequently
-    perc2 = round((total_values_travel(Ibm_df, 'Travel_Frequently')[1] /
-                   total_values_travel(Ibm_df, 'Travel_Frequently')[0]) * 100, 2)
+    perc2 = round((travel_table.loc['Travel_Frequently', 'Attrition_yes'] /
+                   travel_table.loc['Travel_Frequently', 'Total Count']) * 100, 2)
     # for non-travel
-    perc3 = round((total_values_travel(Ibm_df, 'Non-Travel')[1] / total_values_travel(Ibm_df, 'Non-Travel')[0]) * 100,
-                  2)
+    perc3 = round((travel_table.loc['Non-Travel', 'Attrition_yes'] /
+                   travel_table.loc['Non-Travel', 'Total Count']) * 100, 2)
     print('Percentage of attrition for people who rarely travelled ', perc1, "%")
     print('Percentage of attrition for people who frequently travelled ', perc2, "%")
     print('Percentage of attrition for people who did not travel', perc3, "%")
 
-    total_values = total_values_travel(Ibm_df, 'Travel_Rarely')[0] + total_values_travel(Ibm_df, 'Travel_Frequently')[
-        0] + total_values_travel(Ibm_df, 'Non-Travel')[0]
-    count_travel_rarely = total_values_travel(Ibm_df, 'Travel_Rarely')[0]
-    count_travel_frequently = total_values_travel(Ibm_df, 'Travel_Frequently')[0]
-    count_non_travel = total_values_travel(Ibm_df, 'Non-Travel')[0]
+    count_travel_rarely = travel_table.loc['Travel_Rarely', 'Total Count']
+    count_travel_frequently = travel_table.loc['Travel_Frequently', 'Total Count']
+    count_non_travel = travel_table.loc['Non-Travel', 'Total Count']
+    total_values = travel_table['Total Count'].sum()
 
-    d1 = Ibm_df[Ibm_df['DistanceFromHome'] < 25]
+    d1 = Ibm_df.query('DistanceFromHome < 25')
     # when the distance > 25
-    d2 = Ibm_df[Ibm_df['DistanceFromHome'] > 25]
-    att_yes = 0
-    att_no = 0
-    total_att = 0
-
-    for val1 in d1['Attrition']:
-        total_att += 1
-        if val1 == 'Yes':
-            att_yes += 1
-        elif val1 == 'No':
-            att_no += 1
+    d2 = Ibm_df.query('DistanceFromHome > 25')
+    vc1 = d1['Attrition'].value_counts()
+    att_yes, att_no, total_att = vc1.get('Yes', 0), vc1.get('No', 0), len(d1)
 
     perecent1 = round(att_yes / total_att, 2)
     percent2 = round(att_no / total_att, 2)
 
     # print(perecent1 , percent2 )
-    # when the distance is less than 25
-    fig = px.scatter(d1, x='DistanceFromHome', y='Age', color="Attrition")
-    fig.show()
-    # when the distance is greater than 25
-    fig = px.scatter(d2, x='DistanceFromHome', y='Age', color="Attrition")
-    fig.show()
     # when the distance is greater than 25
-    att_yes1 = 0
-    att_no1 = 0
-    total_att1 = 0
-
-    for val2 in d2['Attrition']:
-        total_att1 += 1
-        if val2 == 'Yes':
-            att_yes1 += 1
-        elif val2 == 'No':
-            att_no1 += 1
+    vc2 = d2['Attrition'].value_counts()
+    att_yes1, att_no1, total_att1 = vc2.get('Yes', 0), vc2.get('No', 0), len(d2)
 
     perecent3 = round(att_yes1 / total_att1, 2)
     percent4 = round(att_no1 / total_att1, 2)
 
-    # displaying the distances for each
-
-    labels = ['Attrition when distance is less than 25', 'No attrition when distance is less than 25',
-              'Attrition when distance is more than 25', 'No attrition when distance is more than 25']
     values = [perecent1, percent2, perecent3, percent4]
 
-    fig = go.Figure(data=[go.Pie(labels=labels, values=values)])
-    fig.show()
+    if args.plot:
+        plot_all(d1, d2, values)
 